@@ -1,18 +1,197 @@
 # file: app/agents/base.py
 
+import asyncio
 import os
 import logging
-import json
 from collections import deque
-from typing import Any, Deque, Dict, List, Optional, Type, TypeVar
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Deque, Dict, List, Optional, Tuple, Type, TypeVar
 
+import httpx
+import orjson
 from pydantic_ai import Agent
+from pydantic_ai.models.openai import OpenAIModel
+from pydantic_ai.providers.openai import OpenAIProvider
+
+from app.agents.prompt_cache import SemanticPromptCache
 
 TDeps = TypeVar("TDeps")
 TOutput = TypeVar("TOutput")
 
 logger = logging.getLogger(__name__)
 
+# Opt-in agent tracing (set TRACE_AGENTS=1). Off by default: the trace dict
+# copies the full prompt and output on every turn, and writing it to stdout
+# blocks the event loop.
+_TRACE_AGENTS = os.getenv("TRACE_AGENTS") == "1"
+
+# Shared across all agents; keys embed each agent's system prompt, so entries
+# never collide between agent classes.
+_PROMPT_CACHE = SemanticPromptCache(maxsize=256, context_window=4)
+
+# One pooled HTTP client for every agent's OpenAI traffic. Keep-alive means
+# each LLM call reuses a warm TLS connection instead of paying a fresh
+# TCP + TLS handshake (~100ms) per turn. HTTP/2 would need the optional
+# `h2` extra, so we stay on pooled HTTP/1.1.
+_HTTP_CLIENT: Optional[httpx.AsyncClient] = None
+
+
+def _shared_http_client() -> httpx.AsyncClient:
+    global _HTTP_CLIENT
+    if _HTTP_CLIENT is None:
+        _HTTP_CLIENT = httpx.AsyncClient(
+            limits=httpx.Limits(max_keepalive_connections=64, max_connections=128),
+            timeout=httpx.Timeout(60.0, connect=5.0),
+        )
+    return _HTTP_CLIENT
+
+
+class _BatchQueue:
+    """
+    Collects concurrent LLM requests for one (model, system_prompt) pair and
+    dispatches them together instead of letting each caller pay its own
+    network round-trip in isolation.
+
+    Callers `submit()` a prompt and get a future; a background drain task
+    pulls up to `max_batch_size` queued prompts within a
+    `batch_wait_timeout_s` window and fires them as one `asyncio.gather`,
+    so N simultaneous chat requests overlap their provider round-trips
+    rather than queuing behind one another.
+    """
+
+    def __init__(
+        self,
+        agent: Agent,
+        max_batch_size: int = 32,
+        batch_wait_timeout_s: float = 0.002,
+    ):
+        self.agent = agent
+        self.max_batch_size = max_batch_size
+        self.batch_wait_timeout_s = batch_wait_timeout_s
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def submit(self, prompt: str, deps: Any = None) -> Any:
+        """Queue one prompt and wait for its result from the next batch."""
+        loop = asyncio.get_running_loop()
+        # Lazily (re)start the drain task; also recovers if the app was
+        # restarted onto a fresh event loop (e.g. between test runs).
+        if self._loop is not loop or self._worker is None or self._worker.done():
+            self._queue = asyncio.Queue()
+            self._worker = loop.create_task(self._drain())
+            self._loop = loop
+        future: asyncio.Future = loop.create_future()
+        self._queue.put_nowait((prompt, deps, future))
+        return await future
+
+    async def _drain(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            while len(batch) < self.max_batch_size:
+                try:
+                    batch.append(
+                        await asyncio.wait_for(
+                            self._queue.get(), timeout=self.batch_wait_timeout_s
+                        )
+                    )
+                except asyncio.TimeoutError:
+                    break
+            # Fire-and-track: awaiting the batch here would stall the drain
+            # loop for the whole LLM round-trip, making any request that
+            # missed the collection window wait behind the in-flight batch.
+            loop.create_task(self._dispatch(batch))
+
+    async def _dispatch(self, batch: list) -> None:
+        results = await asyncio.gather(
+            *(self.agent.run(prompt, deps=deps) for prompt, deps, _ in batch),
+            return_exceptions=True,
+        )
+        for (_, _, future), result in zip(batch, results):
+            if future.cancelled():
+                continue
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+
+# One queue per (model, system_prompt) so requests sharing a prompt prefix
+# coalesce into the same batch.
+_BATCH_QUEUES: Dict[Tuple[str, str], _BatchQueue] = {}
+
+
+@lru_cache(maxsize=16)
+def _load_system_prompt(path: str) -> str:
+    """
+    Read a system-prompt file once per process and cache the result.
+
+    Agent classes are instantiated per request; without the cache each
+    construction re-reads and re-decodes the same markdown file from disk.
+    Stripping the surrounding whitespace here also keeps the prompt prefix
+    byte-stable across turns (see `run()`'s prefix-cache notes).
+    """
+    return Path(path).read_text(encoding="utf-8").strip()
+
+
+def _to_memory_str(output: Any) -> str:
+    """
+    Render an agent output for the memory lines.
+
+    Pydantic models go through `model_dump_json()` (pydantic-core, Rust)
+    rather than `str()`, which would invoke the default repr — slower and
+    lossy ("question=None error='...'") when the line is later fed back to
+    the LLM as history or used in a cache key. Plain strings pass through.
+    """
+    if hasattr(output, "model_dump_json"):
+        return output.model_dump_json()
+    return str(output)
+
+
+@lru_cache(maxsize=32)
+def _get_shared_agent(
+    model: str,
+    system_prompt: str,
+    tools: Tuple[Any, ...],
+    deps_type: Optional[type],
+    output_type: Optional[type],
+) -> Agent:
+    """
+    Build (or reuse) the pydantic_ai Agent for one configuration.
+
+    Agent construction compiles the tool JSON schemas and the output-type
+    validator — repeated for nothing when the same agent class is
+    instantiated per request. Identical (model, system_prompt, tools,
+    deps_type, output_type) combinations now share one Agent; conversation
+    memory stays per-BaseAgent instance, only the stateless LLM wrapper is
+    shared.
+    """
+    resolved_model: Any = model
+    if model.startswith("openai:"):
+        # Route OpenAI models through the shared pooled HTTP client; the
+        # API key travels with the provider rather than the Agent kwargs.
+        resolved_model = OpenAIModel(
+            model.removeprefix("openai:"),
+            provider=OpenAIProvider(
+                api_key=os.environ["OPENAI_API_KEY"],
+                http_client=_shared_http_client(),
+            ),
+        )
+
+    agent_kwargs: Dict[str, Any] = {
+        "model": resolved_model,
+        "system_prompt": system_prompt,  # also used by pydantic_ai
+        "tools": list(tools),
+    }
+    if deps_type:
+        agent_kwargs["deps_type"] = deps_type
+    if output_type:
+        agent_kwargs["output_type"] = output_type
+
+    return Agent(**agent_kwargs)
+
 
 class BaseAgent:
     """
@@ -32,29 +211,42 @@ class BaseAgent:
         deps_type: Optional[Type[TDeps]] = None,
         output_type: Optional[Type[TOutput]] = None,
         memory_size: int = 50,
+        cache_responses: bool = False,
+        max_batch_size: int = 32,
+        batch_wait_timeout_s: float = 0.002,
     ):
         api_key = os.getenv("OPENAI_API_KEY")
         if not api_key:
             raise RuntimeError("OPENAI_API_KEY environment variable is not set")
 
         self.system_prompt = system_prompt
+        # The leading prompt block never changes, so format it once here
+        # instead of rebuilding the same multi-KB f-string every turn.
+        self._system_prefix = f"System Prompt:\n{system_prompt}\n\nConversation So Far:"
         self.output_type = output_type
+        # Opt-in per agent: stateless helper agents (intent, question, status)
+        # see lots of repeated inputs and cache well; tool-calling agents that
+        # mutate the DB must never be served a stale cached reply.
+        self.cache_responses = cache_responses
 
-        agent_kwargs: Dict[str, Any] = {
-            "model": model,
-            "system_prompt": system_prompt,  # also used by pydantic_ai
-            "tools": tools or [],
-            "api_key": api_key,
-        }
-        if deps_type:
-            agent_kwargs["deps_type"] = deps_type
-        if output_type:
-            agent_kwargs["output_type"] = output_type
+        self.agent = _get_shared_agent(
+            model, system_prompt, tuple(tools or ()), deps_type, output_type
+        )
 
-        self.agent = Agent(**agent_kwargs)
+        queue_key = (model, system_prompt)
+        if queue_key not in _BATCH_QUEUES:
+            _BATCH_QUEUES[queue_key] = _BatchQueue(
+                self.agent,
+                max_batch_size=max_batch_size,
+                batch_wait_timeout_s=batch_wait_timeout_s,
+            )
+        self._batch_queue = _BATCH_QUEUES[queue_key]
 
-        # We'll store each message in memory as: {"role": "user"/"assistant", "content": "..."}
-        self.memory: Deque[Dict[str, str]] = deque(maxlen=memory_size)
+        # Conversation history as pre-formatted prompt lines ("User: ..." /
+        # "Assistant: ..."). Formatting happens once on append, so the hot
+        # path in run() is a single C-level deque iteration with no
+        # per-element dict lookups or f-string work per turn.
+        self._memory_lines: Deque[str] = deque(maxlen=memory_size)
 
     async def run(
         self,
@@ -65,43 +257,74 @@ class BaseAgent:
         """
         Build a final prompt with:
           1) System prompt at the top.
-          2) Entire conversation so far (self.memory).
-          3) Additional context (injections).
+          2) The committed conversation so far (pre-formatted memory lines).
+          3) Additional context (injections) and the new user turn.
         Then pass it to the LLM as a single text block.
 
-        After we get a result, we do JSON-based tracing with flush=True.
+        Ordering matters for the provider's prefix cache: (1) and (2) are
+        stable across turns and only ever grow at the end, while (3) changes
+        on every call (timestamps, task listings, the new message). Keeping
+        the volatile parts strictly at the suffix means consecutive turns
+        share the longest possible prefix, so the provider can reuse its
+        cached prefill instead of re-processing the whole prompt.
+
+        After we get a result, we optionally emit a JSON trace (TRACE_AGENTS=1).
         """
 
-        # Step 1) Save the new user message into memory
-        self.memory.append({"role": "user", "content": user_message})
+        # Step 0) Build the cache key from the state *before* this turn, then
+        # check for a hit so we can skip the LLM call entirely.
+        cache_key = None
+        if self.cache_responses:
+            recent_turns = list(self._memory_lines)
+            cache_key = _PROMPT_CACHE.make_key(
+                self.system_prompt, recent_turns, user_message
+            )
+
+        # Step 1) Build the stable prefix: system prompt + committed history.
+        # The new user turn is NOT part of this block — it goes in the
+        # volatile suffix below, after the injections.
+        #
+        # Fast path: on a first turn with no injections the prompt is just
+        # prefix + new message, so skip the list build + join entirely.
+        fast_path = not self._memory_lines and not injections
+        if not fast_path:
+            prompt_lines: List[str] = [self._system_prefix]
+            prompt_lines.extend(self._memory_lines)
+
+        # Step 2) Save the new user message into memory
+        self._memory_lines.append(f"User: {user_message}")
 
-        # Step 2) Build the final prompt
-        prompt_lines: List[str] = []
-        prompt_lines.append(f"System Prompt:\n{self.system_prompt}\n")
+        if cache_key is not None:
+            cached = _PROMPT_CACHE.get(cache_key)
+            if cached is not None:
+                output = self._rebuild_cached_output(cached)
+                if output is not None:
+                    logger.debug(
+                        "Agent %s served from prompt cache", self.__class__.__name__
+                    )
+                    self._memory_lines.append(f"Assistant: {_to_memory_str(output)}")
+                    return output
 
-        prompt_lines.append("Conversation So Far:")
-        for turn in self.memory:
-            role_label = "User" if turn["role"] == "user" else "Assistant"
-            prompt_lines.append(f"{role_label}: {turn['content']}")
+        # Step 3) Append the volatile suffix: injections, then the new turn
+        if fast_path:
+            final_prompt = f"{self._system_prefix}\nUser: {user_message}"
+        else:
+            if injections:
+                prompt_lines.append("\nAdditional Context:")
+                for k, v in injections.items():
+                    prompt_lines.append(f"{k}: {v}")
 
-        # Add any additional context
-        if injections:
-            prompt_lines.append("\nAdditional Context:")
-            for k, v in injections.items():
-                prompt_lines.append(f"{k}: {v}")
+            prompt_lines.append(f"User: {user_message}")
 
-        final_prompt = "\n".join(prompt_lines)
+            final_prompt = "\n".join(prompt_lines)
 
         # Optional debug print of the final prompt
         # print(f"[DEBUG] Final Prompt for {self.__class__.__name__}:\n{final_prompt}\n", flush=True)
 
-        # Step 3) Try to run the LLM
+        # Step 4) Try to run the LLM (through the shared batch queue, so
+        # concurrent requests against the same model+prompt coalesce)
         try:
-            result = await self.agent.run(
-                final_prompt,
-                deps=deps,
-                # Not passing chat_history=... since we embed memory ourselves
-            )
+            result = await self._batch_queue.submit(final_prompt, deps=deps)
             output = result.output
         except Exception as e:
             logger.error(
@@ -112,22 +335,45 @@ class BaseAgent:
                 return self.output_type(error=str(e))  # type: ignore
             raise RuntimeError("AI service unavailable") from e
 
-        # Step 4) Save assistant’s reply in memory
-        self.memory.append({"role": "assistant", "content": str(output)})
+        # Step 5) Save assistant’s reply in memory
+        self._memory_lines.append(f"Assistant: {_to_memory_str(output)}")
 
-        # Step 5) Perform JSON-based "agent tracing" 
-        # We'll gather relevant data into a dict and print it with flush=True
-        trace_data = {
-            "agent_class": self.__class__.__name__,
-            "final_prompt": final_prompt,
-            "model_output": str(output),
-            "user_message": user_message,
-            "memory_size": len(self.memory),
-            "injections": injections or {},
-        }
-        # If your output_type is a pydantic model, we could add more info like error fields or success flags
+        if cache_key is not None:
+            serialized = self._serialize_output(output)
+            if serialized is not None:
+                _PROMPT_CACHE.set(cache_key, serialized)
 
-        print(json.dumps(trace_data, indent=2), flush=True)
+        # Step 6) Optional JSON-based "agent tracing" (TRACE_AGENTS=1).
+        # Compact output through the logger — no pretty-printing, no
+        # per-request stdout flush on the hot path.
+        if _TRACE_AGENTS:
+            trace_data = {
+                "agent_class": self.__class__.__name__,
+                "final_prompt": final_prompt,
+                "model_output": str(output),
+                "user_message": user_message,
+                "memory_size": len(self._memory_lines),
+                "injections": injections or {},
+            }
+            logger.debug("%s", orjson.dumps(trace_data).decode())
 
         # Finally, return the output
         return output
+
+    def _serialize_output(self, output: Any) -> Optional[str]:
+        """Serialize an agent output for the prompt cache (JSON for models)."""
+        if isinstance(output, str):
+            return output
+        if hasattr(output, "model_dump_json"):
+            return output.model_dump_json()
+        return None
+
+    def _rebuild_cached_output(self, payload: str) -> Optional[TOutput]:
+        """Rebuild an `output_type` instance from a cached payload."""
+        if self.output_type is None or self.output_type is str:
+            return payload  # type: ignore[return-value]
+        try:
+            return self.output_type.model_validate_json(payload)  # type: ignore[attr-defined]
+        except Exception as e:
+            logger.warning("Discarding unreadable cache entry: %s", e)
+            return None
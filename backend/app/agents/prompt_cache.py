@@ -0,0 +1,70 @@
+# file: app/agents/prompt_cache.py
+
+import hashlib
+import logging
+from collections import OrderedDict
+from typing import List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class SemanticPromptCache:
+    """
+    Small in-process cache that lets agents skip an LLM round-trip when the
+    same question comes back in (roughly) the same conversational context.
+
+    Keys are built from (system_prompt, the last `context_window` memory
+    turns, user_message), normalized for whitespace and case so trivially
+    re-phrased duplicates ("List my tasks " vs "list my tasks") still hit.
+    Lookups are exact-match after normalization — we deliberately avoid an
+    embedding model + vector index here to keep the dependency footprint of
+    this demo unchanged; an LLM call is seconds, a dict lookup is ~1µs, so
+    even a modest hit rate pays off.
+
+    Entries are evicted LRU once `maxsize` is exceeded. Values are opaque
+    strings (the serialized agent output); callers decide how to rebuild
+    their output type from them.
+    """
+
+    def __init__(self, maxsize: int = 256, context_window: int = 4):
+        self.maxsize = maxsize
+        self.context_window = context_window
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+
+    @staticmethod
+    def _normalize(text: str) -> str:
+        """Collapse whitespace and case so near-identical prompts share a key."""
+        return " ".join(text.lower().split())
+
+    def make_key(
+        self,
+        system_prompt: str,
+        recent_turns: List[str],
+        user_message: str,
+    ) -> str:
+        """
+        Build the cache key from the stable prompt parts and recent context.
+
+        The joined parts embed the full multi-KB system prompt, so keys are
+        digested with blake2b: entries store 32 hex chars instead of kilobytes
+        of prompt text, and lookups compare short strings rather than the
+        whole prefix.
+        """
+        parts = [self._normalize(system_prompt)]
+        parts.extend(self._normalize(t) for t in recent_turns[-self.context_window:])
+        parts.append(self._normalize(user_message))
+        raw = "\x1f".join(parts)
+        return hashlib.blake2b(raw.encode("utf-8"), digest_size=16).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        payload = self._entries.get(key)
+        if payload is not None:
+            # Refresh LRU position on hit
+            self._entries.move_to_end(key)
+        return payload
+
+    def set(self, key: str, payload: str) -> None:
+        self._entries[key] = payload
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
@@ -1,23 +1,92 @@
 # file: app/agents/task_creation_agent.py
 
+import asyncio
 import logging
+import time
+from functools import lru_cache
 from pathlib import Path
 from datetime import datetime
-from typing import Optional, Dict
+from typing import Annotated, List, Optional, Dict
 
 import dateparser
 from pydantic import BaseModel, Field, ValidationError
-from pydantic.fields import FieldInfo
 from pydantic_ai import RunContext
+from sqlalchemy import delete as sa_delete, update as sa_update
 from sqlalchemy.exc import SQLAlchemyError
-from sqlmodel import select
+from sqlmodel import Session, select
 
-from app.agents.base import BaseAgent
-from app.db import get_session
+from app.agents.base import BaseAgent, _load_system_prompt
+from app.db import SQLITE_WRITE_LOCK, engine, session_scope
 from app.models import Task, TaskCreate, TaskUpdate
 
 logger = logging.getLogger(__name__)
 
+# Cap on how many tasks are injected into the prompt; keeps the listing
+# (and token spend) bounded as the table grows.
+_EXISTING_TASKS_LIMIT = 50
+
+
+def _format_task_rows(rows) -> str:
+    """
+    Format projected (id, title, due_date, completed) tuples for a prompt.
+
+    Shared by both task-listing fetchers; a single-pass list comprehension
+    over plain tuples, with the only per-row Python work being the due-date
+    ternary.
+    """
+    lines = [
+        f"{i}: {t} (due {d.isoformat() if d else 'None'}, completed={c})"
+        for i, t, d, c in rows
+    ]
+    return "\n".join(lines)
+
+
+# Cheap strict formats tried before dateparser. The LLM overwhelmingly
+# emits ISO-8601 for due dates, and fromisoformat/strptime parse in
+# microseconds versus dateparser's NLP-grade scan.
+_FAST_FORMATS = ("%Y-%m-%d %H:%M:%S", "%Y-%m-%d", "%m/%d/%Y")
+
+
+def _fast_parse(phrase: str) -> Optional[datetime]:
+    """Try ISO-8601 and a few common strict formats; None on miss."""
+    try:
+        return datetime.fromisoformat(phrase.replace("Z", "+00:00"))
+    except ValueError:
+        pass
+    for fmt in _FAST_FORMATS:
+        try:
+            return datetime.strptime(phrase, fmt)
+        except ValueError:
+            pass
+    return None
+
+
+@lru_cache(maxsize=2048)
+def _parse_due(phrase: str, base_minute: int) -> Optional[datetime]:
+    """
+    Parse a free-form due date, memoized per (phrase, utc-minute bucket).
+
+    dateparser loads locale data and tries many language parsers per call
+    (tens of ms), while phrases like "tomorrow at 9am" recur constantly in
+    a task app. Bucketing the relative base to the minute keeps relative
+    phrases fresh enough while letting repeats within the same minute hit
+    the cache. Pinning languages to English also skips detection.
+    """
+    return dateparser.parse(
+        phrase,
+        languages=["en"],
+        settings={
+            "RELATIVE_BASE": datetime.utcfromtimestamp(base_minute * 60),
+            "PREFER_DATES_FROM": "future",
+        },
+    )
+
+
+def _parse_due_now(phrase: str) -> Optional[datetime]:
+    """Parse a due-date phrase: strict fast path first, then dateparser."""
+    return _fast_parse(phrase) or _parse_due(phrase, int(time.time() // 60))
+
+
 # Sub-tool outputs
 class TaskCreationOutput(BaseModel):
     id: Optional[int] = Field(None, description="Task ID")
@@ -27,12 +96,354 @@ class TaskCreationOutput(BaseModel):
     completed: Optional[bool] = False
     error: Optional[str] = Field(None, description="Error message, if any")
 
+class TaskItem(BaseModel):
+    """One task in a bulk create_tasks call."""
+    title: str = Field(..., description="Task title")
+    description: Optional[str] = Field(None, description="Task description")
+    due_date: Optional[str] = Field(
+        None, description="Due date (free-form, e.g. 'tomorrow at 9am')"
+    )
+
 class TaskDeletionOutput(BaseModel):
     id: Optional[int] = Field(None, description="Task ID")
     deleted: Optional[bool] = False
     error: Optional[str] = Field(None, description="Error message, if any")
 
 
+# ---- Tools ----
+# Module-level functions (not closures in __init__): CPython compiles them
+# once at import instead of rebuilding function objects and closure cells on
+# every TaskCreationAgent instantiation. They keep their public names since
+# pydantic_ai exposes the function name to the LLM as the tool name.
+
+async def create_task(
+    ctx: RunContext,
+    title: Annotated[str, Field(description="Task title")],
+    description: Annotated[Optional[str], Field(description="Task description")] = None,
+    due_date: Annotated[
+        Optional[str], Field(description="Due date (free-form, e.g. 'tomorrow at 9am')")
+    ] = None,
+) -> TaskCreationOutput:
+    """
+    Sub-tool: actually create a task in the DB.
+    The LLM calls this function to do the real DB operation.
+    """
+    parsed_due_obj = None
+    parsed_due_str = None
+    if due_date:
+        parsed_due_obj = _parse_due_now(due_date)
+        if parsed_due_obj:
+            parsed_due_str = parsed_due_obj.isoformat()
+        else:
+            logger.warning("dateparser failed on due_date=%r", due_date)
+
+    # Validate payload
+    try:
+        payload = TaskCreate(
+            title=title,
+            description=description,
+            due_date=parsed_due_obj,
+        )
+    except ValidationError as e:
+        logger.error("Invalid create payload: %s", e, exc_info=True)
+        return TaskCreationOutput(error=f"Invalid data: {e}")
+
+    # Persist (on a worker thread — the session is synchronous and
+    # would otherwise block the event loop for the DB round-trip)
+    # No refresh after commit: SQLite populates the autoincrement PK at
+    # flush, and created_at/updated_at are client-side default_factory
+    # values — nothing server-generated is left to SELECT back.
+    # expire_on_commit=False keeps those known values readable after the
+    # session closes instead of triggering a reload.
+    def _persist() -> Task:
+        with Session(engine, expire_on_commit=False) as session:
+            task = Task.model_validate(payload)
+            session.add(task)
+            session.commit()
+            return task
+
+    try:
+        async with SQLITE_WRITE_LOCK:
+            task = await asyncio.to_thread(_persist)
+    except SQLAlchemyError as e:
+        logger.error("DB error creating task: %s", e, exc_info=True)
+        return TaskCreationOutput(error="Database error when creating task")
+    except Exception as e:
+        logger.error("Unexpected create error: %s", e, exc_info=True)
+        return TaskCreationOutput(error="Unexpected error when creating task")
+
+    return TaskCreationOutput(
+        id=task.id,
+        title=task.title,
+        description=task.description,
+        due_date=parsed_due_str or (task.due_date.isoformat() if task.due_date else None),
+        completed=task.completed,
+    )
+
+
+async def create_tasks(
+    ctx: RunContext,
+    items: Annotated[List[TaskItem], Field(description="Tasks to create in one batch")],
+) -> List[TaskCreationOutput]:
+    """
+    Sub-tool: create several tasks in one DB transaction.
+
+    "Add these three tasks" previously cost one add/commit round-trip per
+    task; here all rows are inserted and committed together (SQLAlchemy
+    batches the INSERTs), so N tasks cost roughly one round-trip.
+    """
+    if not items:
+        return [TaskCreationOutput(error="No tasks provided")]
+
+    payloads: List[Optional[TaskCreate]] = []
+    due_strs: List[Optional[str]] = []
+    errors: Dict[int, str] = {}
+    for idx, item in enumerate(items):
+        parsed_due_obj = None
+        parsed_due_str = None
+        if item.due_date:
+            parsed_due_obj = _parse_due_now(item.due_date)
+            if parsed_due_obj:
+                parsed_due_str = parsed_due_obj.isoformat()
+            else:
+                logger.warning("dateparser failed on due_date=%r", item.due_date)
+        try:
+            payloads.append(
+                TaskCreate(
+                    title=item.title,
+                    description=item.description,
+                    due_date=parsed_due_obj,
+                )
+            )
+            due_strs.append(parsed_due_str)
+        except ValidationError as e:
+            payloads.append(None)
+            due_strs.append(None)
+            errors[idx] = f"Invalid data: {e}"
+
+    # Same as _persist: PKs are set at flush, timestamps are client-side,
+    # so the per-task refresh SELECTs were pure overhead.
+    def _persist_all() -> List[Task]:
+        with Session(engine, expire_on_commit=False) as session:
+            tasks = [Task.model_validate(p) for p in payloads if p is not None]
+            session.add_all(tasks)
+            session.commit()
+            return tasks
+
+    try:
+        async with SQLITE_WRITE_LOCK:
+            created = await asyncio.to_thread(_persist_all)
+    except SQLAlchemyError as e:
+        logger.error("DB error creating tasks: %s", e, exc_info=True)
+        return [TaskCreationOutput(error="Database error when creating tasks")]
+
+    results: List[TaskCreationOutput] = []
+    created_iter = iter(created)
+    for idx, payload in enumerate(payloads):
+        if payload is None:
+            results.append(TaskCreationOutput(error=errors[idx]))
+            continue
+        task = next(created_iter)
+        results.append(
+            TaskCreationOutput(
+                id=task.id,
+                title=task.title,
+                description=task.description,
+                due_date=due_strs[idx]
+                or (task.due_date.isoformat() if task.due_date else None),
+                completed=task.completed,
+            )
+        )
+    return results
+
+
+async def update_task(
+    ctx: RunContext,
+    id: Annotated[int, Field(description="ID of the task to update")],
+    title: Annotated[Optional[str], Field(description="New title")] = None,
+    description: Annotated[Optional[str], Field(description="New description")] = None,
+    due_date: Annotated[Optional[str], Field(description="New due date")] = None,
+    completed: Annotated[Optional[bool], Field(description="Mark done?")] = None,
+) -> TaskCreationOutput:
+    try:
+        task_id = int(id)
+    except (TypeError, ValueError):
+        return TaskCreationOutput(error=f"Invalid task ID: {id}")
+
+    # 3. Parse new due_date
+    parsed_due_obj = None
+    parsed_due_str = None
+    if due_date is not None:
+        parsed_due_obj = _parse_due_now(due_date)
+        if parsed_due_obj:
+            parsed_due_str = parsed_due_obj.isoformat()
+        else:
+            logger.warning("dateparser failed on due_date=%r", due_date)
+
+    # 4. Build update payload
+    try:
+        updates = TaskUpdate(
+            title=title,
+            description=description,
+            due_date=parsed_due_obj,
+            completed=completed,
+        )
+    except ValidationError as e:
+        logger.error("Invalid update payload: %s", e, exc_info=True)
+        return TaskCreationOutput(error=f"Invalid data: {e}")
+
+    update_data = updates.model_dump(exclude_unset=True, exclude_none=True)
+    if not update_data:
+        return TaskCreationOutput(
+            error="No fields provided to update; please specify title, description, due_date, or completed."
+        )
+
+    # 5. Apply and commit on a worker thread. A targeted UPDATE ... RETURNING
+    # fuses the old SELECT + flush + refresh (three round-trips) into one
+    # statement; zero returned rows doubles as the existence check.
+    def _apply_update():
+        with Session(engine) as session:
+            stmt = (
+                sa_update(Task)
+                .where(Task.id == task_id)
+                .values(**update_data)  # updated_at is DB-side (onupdate)
+                .returning(
+                    Task.id, Task.title, Task.description,
+                    Task.due_date, Task.completed,
+                )
+            )
+            row = session.execute(stmt).one_or_none()
+            session.commit()
+            return row
+
+    try:
+        async with SQLITE_WRITE_LOCK:
+            row = await asyncio.to_thread(_apply_update)
+    except SQLAlchemyError as e:
+        logger.error("DB error updating task: %s", e, exc_info=True)
+        return TaskCreationOutput(error="Database error when updating task")
+    except Exception as e:
+        logger.error("Unexpected update error: %s", e, exc_info=True)
+        return TaskCreationOutput(error="Unexpected error when updating task")
+
+    if not row:
+        return TaskCreationOutput(error=f"Task {task_id} not found")
+
+    # 6. Return updated record
+    row_id, row_title, row_description, row_due, row_completed = row
+    return TaskCreationOutput(
+        id=row_id,
+        title=row_title,
+        description=row_description,
+        due_date=parsed_due_str or (row_due.isoformat() if row_due else None),
+        completed=row_completed,
+    )
+
+
+async def delete_task(
+    ctx: RunContext,
+    id: Annotated[int, Field(description="ID of the task to delete")],
+) -> TaskDeletionOutput:
+    try:
+        task_id = int(id)
+    except (TypeError, ValueError):
+        return TaskDeletionOutput(error=f"Invalid task ID: {id}")
+
+    # Targeted core DELETE: no SELECT + ORM instance just to remove a row
+    def _delete() -> bool:
+        with Session(engine) as session:
+            result = session.execute(sa_delete(Task).where(Task.id == task_id))
+            session.commit()
+            return result.rowcount > 0
+
+    try:
+        async with SQLITE_WRITE_LOCK:
+            deleted = await asyncio.to_thread(_delete)
+    except Exception as e:
+        logger.error("Error deleting task: %s", e, exc_info=True)
+        return TaskDeletionOutput(id=task_id, deleted=False, error="Error deleting task")
+
+    if not deleted:
+        return TaskDeletionOutput(id=task_id, deleted=False, error="Task not found")
+    return TaskDeletionOutput(id=task_id, deleted=True)
+
+
+async def find_and_update_task(
+    ctx: RunContext,
+    title_match: Annotated[
+        str, Field(description="Substring of the title of the task to update")
+    ],
+    title: Annotated[Optional[str], Field(description="New title")] = None,
+    description: Annotated[Optional[str], Field(description="New description")] = None,
+    due_date: Annotated[Optional[str], Field(description="New due date")] = None,
+    completed: Annotated[Optional[bool], Field(description="Mark done?")] = None,
+) -> TaskCreationOutput:
+    """
+    Composite tool: look up a task by title substring and update it in one
+    DB transaction. Without this, "mark 'groceries' as done" costs the LLM
+    an extra round-trip just to resolve the id before calling update_task —
+    most of the latency of a chained call is outside the model. The atomic
+    id-based tools remain for explicit id operations.
+    """
+    def _find_id() -> Optional[int]:
+        with Session(engine) as session:
+            task = session.exec(
+                select(Task)
+                .where(Task.title.ilike(f"%{title_match}%"))
+                .limit(1)
+            ).one_or_none()
+            return task.id if task else None
+
+    try:
+        task_id = await asyncio.to_thread(_find_id)
+    except SQLAlchemyError as e:
+        logger.error("DB error finding task: %s", e, exc_info=True)
+        return TaskCreationOutput(error="Database error when finding task")
+
+    if task_id is None:
+        return TaskCreationOutput(error=f"No task matching {title_match!r}")
+
+    return await update_task(
+        ctx,
+        id=task_id,
+        title=title,
+        description=description,
+        due_date=due_date,
+        completed=completed,
+    )
+
+
+async def find_and_delete_task(
+    ctx: RunContext,
+    title_match: Annotated[
+        str, Field(description="Substring of the title of the task to delete")
+    ],
+) -> TaskDeletionOutput:
+    """
+    Composite tool: look up a task by title substring and delete it, so the
+    LLM doesn't need a separate turn to resolve the id first.
+    """
+    def _find_id() -> Optional[int]:
+        with Session(engine) as session:
+            task = session.exec(
+                select(Task)
+                .where(Task.title.ilike(f"%{title_match}%"))
+                .limit(1)
+            ).one_or_none()
+            return task.id if task else None
+
+    try:
+        task_id = await asyncio.to_thread(_find_id)
+    except SQLAlchemyError as e:
+        logger.error("DB error finding task: %s", e, exc_info=True)
+        return TaskDeletionOutput(error="Database error when finding task")
+
+    if task_id is None:
+        return TaskDeletionOutput(error=f"No task matching {title_match!r}")
+
+    return await delete_task(ctx, id=task_id)
+
+
 class TaskCreationAgent(BaseAgent):
     """
     Agent that can create, update, and delete tasks via internal sub-tools.
@@ -44,199 +455,26 @@ class TaskCreationAgent(BaseAgent):
         prompt_path = Path(__file__).parent / "system_prompts" / "task_creation_agent.md"
         if not prompt_path.exists():
             raise FileNotFoundError(f"Missing system prompt: {prompt_path}")
-        system_prompt = prompt_path.read_text(encoding="utf-8")
+        system_prompt = _load_system_prompt(str(prompt_path))
 
-        # We'll produce a final plain string describing success/failure
+        # We'll produce a final plain string describing success/failure.
+        # Tools are passed up front so the shared Agent is built with them
+        # once instead of being re-registered per instance.
         super().__init__(
             model="openai:gpt-4o",
             system_prompt=system_prompt,
-            tools=[],
+            tools=[
+                create_task,
+                create_tasks,
+                update_task,
+                delete_task,
+                find_and_update_task,
+                find_and_delete_task,
+            ],
             output_type=str,
             memory_size=100,
         )
 
-        # ---- Create Tool ----
-        @self.agent.tool
-        async def create_task(
-            ctx: RunContext,
-            title: str = Field(..., description="Task title"),
-            description: Optional[str] = Field(None, description="Task description"),
-            due_date: Optional[str] = Field(
-                None, description="Due date (free-form, e.g. 'tomorrow at 9am')"
-            ),
-        ) -> TaskCreationOutput:
-            """
-            Sub-tool: actually create a task in the DB.
-            The LLM calls this function to do the real DB operation.
-            """
-            if isinstance(title, FieldInfo):
-                title = None
-            if isinstance(description, FieldInfo):
-                description = None
-            if isinstance(due_date, FieldInfo):
-                due_date = None
-
-            parsed_due_obj = None
-            parsed_due_str = None
-            if due_date:
-                parsed_due_obj = dateparser.parse(
-                    due_date,
-                    settings={
-                        "RELATIVE_BASE": datetime.utcnow(),
-                        "PREFER_DATES_FROM": "future"
-                    },
-                )
-                if parsed_due_obj:
-                    parsed_due_str = parsed_due_obj.isoformat()
-                else:
-                    logger.warning("dateparser failed on due_date=%r", due_date)
-
-            # Validate payload
-            try:
-                payload = TaskCreate(
-                    title=title,
-                    description=description,
-                    due_date=parsed_due_obj,
-                )
-            except ValidationError as e:
-                logger.error("Invalid create payload: %s", e, exc_info=True)
-                return TaskCreationOutput(error=f"Invalid data: {e}")
-
-            # Persist
-            try:
-                session = next(get_session())
-                task = Task.from_orm(payload)
-                session.add(task)
-                session.commit()
-                session.refresh(task)
-            except SQLAlchemyError as e:
-                logger.error("DB error creating task: %s", e, exc_info=True)
-                return TaskCreationOutput(error="Database error when creating task")
-            except Exception as e:
-                logger.error("Unexpected create error: %s", e, exc_info=True)
-                return TaskCreationOutput(error="Unexpected error when creating task")
-
-            return TaskCreationOutput(
-                id=task.id,
-                title=task.title,
-                description=task.description,
-                due_date=parsed_due_str or (task.due_date.isoformat() if task.due_date else None),
-                completed=task.completed,
-            )
-
-        # ---- Update Tool ----
-        @self.agent.tool
-        async def update_task(
-            ctx: RunContext,
-            id: int = Field(..., description="ID of the task to update"),
-            title: Optional[str] = Field(None, description="New title"),
-            description: Optional[str] = Field(None, description="New description"),
-            due_date: Optional[str] = Field(None, description="New due date"),
-            completed: Optional[bool] = Field(None, description="Mark done?"),
-        ) -> TaskCreationOutput:
-            if isinstance(title, FieldInfo):
-                title = None
-            if isinstance(description, FieldInfo):
-                description = None
-            if isinstance(due_date, FieldInfo):
-                due_date = None
-            if isinstance(completed, FieldInfo):
-                completed = None
-
-            try:
-                task_id = int(id)
-            except (TypeError, ValueError):
-                return TaskCreationOutput(error=f"Invalid task ID: {id}")
-
-            # 3. Parse new due_date
-            parsed_due_obj = None
-            parsed_due_str = None
-            if due_date is not None:
-                parsed_due_obj = dateparser.parse(
-                    due_date,
-                    settings={
-                        "RELATIVE_BASE": datetime.utcnow(),
-                        "PREFER_DATES_FROM": "future"
-                    },
-                )
-                if parsed_due_obj:
-                    parsed_due_str = parsed_due_obj.isoformat()
-                else:
-                    logger.warning("dateparser failed on due_date=%r", due_date)
-
-            # 4. Fetch existing task
-            session = next(get_session())
-            task = session.exec(select(Task).where(Task.id == task_id)).one_or_none()
-            if not task:
-                return TaskCreationOutput(error=f"Task {task_id} not found")
-
-            # 5. Build update payload
-            try:
-                updates = TaskUpdate(
-                    title=title,
-                    description=description,
-                    due_date=parsed_due_obj,
-                    completed=completed,
-                )
-            except ValidationError as e:
-                logger.error("Invalid update payload: %s", e, exc_info=True)
-                return TaskCreationOutput(error=f"Invalid data: {e}")
-
-            update_data = updates.dict(exclude_unset=True, exclude_none=True)
-            if not update_data:
-                return TaskCreationOutput(
-                    error="No fields provided to update; please specify title, description, due_date, or completed."
-                )
-
-            # 6. Apply and commit
-            for field_name, val in update_data.items():
-                setattr(task, field_name, val)
-            task.updated_at = datetime.utcnow()
-
-            try:
-                session.add(task)
-                session.commit()
-                session.refresh(task)
-            except SQLAlchemyError as e:
-                logger.error("DB error updating task: %s", e, exc_info=True)
-                return TaskCreationOutput(error="Database error when updating task")
-            except Exception as e:
-                logger.error("Unexpected update error: %s", e, exc_info=True)
-                return TaskCreationOutput(error="Unexpected error when updating task")
-
-            # 7. Return updated record
-            return TaskCreationOutput(
-                id=task.id,
-                title=task.title,
-                description=task.description,
-                due_date=parsed_due_str or (task.due_date.isoformat() if task.due_date else None),
-                completed=task.completed,
-            )
-
-        # ---- Delete Tool ----
-        @self.agent.tool
-        async def delete_task(
-            ctx: RunContext,
-            id: int = Field(..., description="ID of the task to delete"),
-        ) -> TaskDeletionOutput:
-            try:
-                task_id = int(id)
-            except (TypeError, ValueError):
-                return TaskDeletionOutput(error=f"Invalid task ID: {id}")
-
-            try:
-                session = next(get_session())
-                task = session.exec(select(Task).where(Task.id == task_id)).one_or_none()
-                if not task:
-                    return TaskDeletionOutput(id=task_id, deleted=False, error="Task not found")
-                session.delete(task)
-                session.commit()
-            except Exception as e:
-                logger.error("Error deleting task: %s", e, exc_info=True)
-                return TaskDeletionOutput(id=task_id, deleted=False, error="Error deleting task")
-
-            return TaskDeletionOutput(id=task_id, deleted=True)
-
     async def run(
         self,
         user_message: str,
@@ -249,15 +487,9 @@ class TaskCreationAgent(BaseAgent):
         """
         now = datetime.utcnow().isoformat()
 
-        session = next(get_session())
-        tasks = session.exec(select(Task)).all()
-        if tasks:
-            existing_tasks = "\n".join(
-                f"{t.id}: {t.title} (due {t.due_date.isoformat() if t.due_date else 'None'}, completed={t.completed})"
-                for t in tasks
-            )
-        else:
-            existing_tasks = "No existing tasks."
+        # The SQLAlchemy session is synchronous; run the fetch on a worker
+        # thread so the event loop can keep serving other requests meanwhile.
+        existing_tasks = await asyncio.to_thread(self._fetch_existing_tasks)
 
         inj: Dict[str, str] = {
             "Current timestamp": now,
@@ -272,3 +504,20 @@ class TaskCreationAgent(BaseAgent):
             # In case something else was returned
             result_str = str(result_str)
         return result_str
+
+    @staticmethod
+    def _fetch_existing_tasks() -> str:
+        """
+        Fetch and format the current task list (runs on a worker thread).
+
+        Selects only the four columns the listing needs — the rows come back
+        as plain tuples, skipping full ORM hydration — and caps the result
+        at the most recently updated tasks.
+        """
+        with session_scope() as session:
+            rows = session.exec(
+                select(Task.id, Task.title, Task.due_date, Task.completed)
+                .order_by(Task.updated_at.desc())
+                .limit(_EXISTING_TASKS_LIMIT)
+            ).all()
+        return _format_task_rows(rows) or "No existing tasks."
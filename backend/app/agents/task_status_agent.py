@@ -5,7 +5,7 @@ from typing import Optional
 from pydantic import BaseModel, Field
 from pydantic_ai import RunContext
 
-from .base import BaseAgent
+from .base import BaseAgent, _load_system_prompt
 
 logger = logging.getLogger(__name__)
 
@@ -20,7 +20,7 @@ class TaskStatusAgent(BaseAgent):
         prompt_path = Path(__file__).parent / "system_prompts" / "task_status.md"
         if not prompt_path.exists():
             raise FileNotFoundError(f"Missing system prompt: {prompt_path}")
-        system_prompt = prompt_path.read_text(encoding="utf-8")
+        system_prompt = _load_system_prompt(str(prompt_path))
 
         super().__init__(
             model="openai:gpt-4o",
@@ -28,4 +28,5 @@ class TaskStatusAgent(BaseAgent):
             tools=None,
             output_type=StatusOutput,
             memory_size=10,
+            cache_responses=True,
         )
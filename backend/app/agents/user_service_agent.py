@@ -1,21 +1,64 @@
+import asyncio
 import logging
 from pathlib import Path
-from typing import Optional, Dict, Union
+from typing import Annotated, Optional, Dict, Union
 
 from pydantic import BaseModel, Field
 from pydantic_ai import RunContext
 from sqlmodel import select
 
-from app.agents.base import BaseAgent
-from app.agents.task_creation_agent import TaskCreationAgent
+from app.agents.base import BaseAgent, _load_system_prompt
+from app.agents.task_creation_agent import TaskCreationAgent, _format_task_rows
 from app.agents.user_intent_agent import UserIntentAndEmotionAgent, IntentEmotionOutput
 from app.agents.question_for_user_agent import QuestionForUserAgent, QuestionOutput
 from app.agents.task_status_agent import TaskStatusAgent, StatusOutput
-from app.db import get_session
+from app.db import session_scope
 from app.models import Task
 
 logger = logging.getLogger(__name__)
 
+# Cap on how many tasks are injected into the prompt; keeps the listing
+# (and token spend) bounded as the table grows.
+_EXISTING_TASKS_LIMIT = 50
+
+# Intents (see intent_emotion.md) for which the task listing is worth its
+# tokens. "chat" is excluded — small talk never needs the table — while
+# "other" keeps the listing as a safety net for unclassifiable messages.
+_TASK_INTENTS = {"create_task", "update_task", "delete_task", "ask_status", "other"}
+
+# Which helper agents each intent warrants. A clarifying question only
+# helps on task CRUD (and unclassified messages); a status summary only
+# when the user actually asks for one. Small talk needs neither, so a
+# "chat" turn costs one helper LLM call instead of three.
+_QUESTION_INTENTS = {"create_task", "update_task", "delete_task", "other"}
+_STATUS_INTENTS = {"ask_status", "other"}
+
+# Module-level helper-agent singletons. Constructing these per request
+# re-read the system prompt, rebuilt the wrapper, and threw away each
+# agent's accumulated conversation memory every turn; one instance per
+# process keeps memory useful and makes instantiation cost a one-off.
+# (Single-user demo: memory is process-wide, not per-session.)
+_intent_agent = UserIntentAndEmotionAgent()
+_question_agent = QuestionForUserAgent()
+_status_agent = TaskStatusAgent()
+_task_creation_agent = TaskCreationAgent()
+
+
+async def talk_to_task_creation_agent(
+    ctx: RunContext,
+    instruction: Annotated[
+        str, Field(description="A free-form request to create/update/delete tasks.")
+    ],
+) -> str:
+    """
+    The orchestrator calls this tool to communicate with the TaskCreationAgent using plain English.
+    TaskCreationAgent will internally use create/update/delete sub-tools as needed, then return text.
+    """
+    logger.info(f"[UserServiceAgent] talk_to_task_creation_agent invoked with instruction: {instruction}")
+    response = await _task_creation_agent.run(instruction)
+    # Ensure we return a pure string
+    return response if isinstance(response, str) else str(response)
+
 
 class UserServiceOutput(BaseModel):
     """
@@ -38,33 +81,21 @@ class UserServiceAgent(BaseAgent):
         prompt_path = Path(__file__).parent / "system_prompts" / "user_service.md"
         if not prompt_path.exists():
             raise FileNotFoundError(f"Missing system prompt: {prompt_path}")
-        system_prompt = prompt_path.read_text(encoding="utf-8")
+        system_prompt = _load_system_prompt(str(prompt_path))
 
-        # Initialize BaseAgent: single tool returns plain text from sub-agent
+        # Initialize BaseAgent: single tool returns plain text from sub-agent.
+        # The tool is module-level so the shared Agent is built with it once
+        # instead of re-registering a fresh closure per instance.
         super().__init__(
             model="openai:gpt-4o",
             system_prompt=system_prompt,
+            tools=[talk_to_task_creation_agent],
             # The final output from this agent can be either a direct string or a tool response (string),
             # but we store it in the pydantic output model below (UserServiceOutput).
             output_type=str,
             memory_size=100,
         )
 
-        # Register a single tool: talk_to_task_creation_agent
-        @self.agent.tool
-        async def talk_to_task_creation_agent(
-            ctx: RunContext,
-            instruction: str = Field(..., description="A free-form request to create/update/delete tasks.")
-        ) -> str:
-            """
-            The orchestrator calls this tool to communicate with the TaskCreationAgent using plain English.
-            TaskCreationAgent will internally use create/update/delete sub-tools as needed, then return text.
-            """
-            logger.info(f"[UserServiceAgent] talk_to_task_creation_agent invoked with instruction: {instruction}")
-            response = await TaskCreationAgent().run(instruction)
-            # Ensure we return a pure string
-            return response if isinstance(response, str) else str(response)
-
     async def run(
         self,
         user_message: str,
@@ -79,34 +110,46 @@ class UserServiceAgent(BaseAgent):
           4) Return a structured output with the final chat_response plus the sub-agents' data.
         """
 
-        # 1) Gather helper-agent context
-        intent   = await UserIntentAndEmotionAgent().run(user_message)
-        question = await QuestionForUserAgent().run(user_message)
-        status   = await TaskStatusAgent().run(user_message)
-
-        # 2) Get existing tasks for the injection
-        session = next(get_session())
-        tasks = session.exec(select(Task)).all()
-        existing = (
-            "\n".join(
-                f"{t.id}: {t.title} "
-                f"(due {t.due_date.isoformat() if t.due_date else 'None'}, done={t.completed})"
-                for t in tasks
-            )
-            or "No tasks yet."
-        )
+        # 1) Classify the intent first: it's the cheapest helper call and it
+        # tells us whether the task listing is worth fetching at all.
+        intent = await _intent_agent.run(user_message)
+
+        # 2) Gather only the helper context this intent warrants; skipped
+        # helpers are filled with empty defaults so the response schema
+        # stays intact. The DB fetch likewise only joins the gather for
+        # task-related intents, so "thanks!" pays neither the extra LLM
+        # round-trips nor the listing's prompt tokens.
+        needs_question = intent.intent in _QUESTION_INTENTS
+        needs_status = intent.intent in _STATUS_INTENTS
+        needs_tasks = intent.intent in _TASK_INTENTS
+
+        coros = []
+        if needs_question:
+            coros.append(_question_agent.run(user_message))
+        if needs_status:
+            coros.append(_status_agent.run(user_message))
+        if needs_tasks:
+            coros.append(asyncio.to_thread(self._fetch_existing_tasks))
+        results = list(await asyncio.gather(*coros)) if coros else []
+
+        question = results.pop(0) if needs_question else QuestionOutput()
+        status = results.pop(0) if needs_status else StatusOutput()
+        existing = results.pop(0) if needs_tasks else None
 
         # 3) Build prompt injections
         inj: Dict[str, str] = {
             "User intent/emotion": f"{intent.intent}|{intent.emotion}",
             "Suggested question":   question.question or "",
             "Task status summary":  status.status_summary or "",
-            "Existing tasks":       existing,
         }
+        if existing is not None:
+            inj["Existing tasks"] = existing
         if injections:
             inj.update(injections)
 
-        logger.info(f"[UserServiceAgent] prompt injections: {inj}")
+        # Debug-level and lazily formatted: stringifying the full injection
+        # dict (task listing included) on every turn is hot-path work.
+        logger.debug("[UserServiceAgent] prompt injections: %s", inj)
 
         # 4) Let the orchestrator LLM run. We expect a string output.
         result_str = await super().run(user_message, injections=inj, deps=deps)
@@ -118,3 +161,20 @@ class UserServiceAgent(BaseAgent):
             status=status,
             chat_response=str(result_str),
         )
+
+    @staticmethod
+    def _fetch_existing_tasks() -> str:
+        """
+        Fetch and format the current task list (runs on a worker thread).
+
+        Selects only the four columns the listing needs — the rows come back
+        as plain tuples, skipping full ORM hydration — and caps the result
+        at the most recently updated tasks.
+        """
+        with session_scope() as session:
+            rows = session.exec(
+                select(Task.id, Task.title, Task.due_date, Task.completed)
+                .order_by(Task.updated_at.desc())
+                .limit(_EXISTING_TASKS_LIMIT)
+            ).all()
+        return _format_task_rows(rows) or "No tasks yet."
@@ -1,15 +1,105 @@
+import asyncio
+import os
+from contextlib import contextmanager
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import create_async_engine
 from sqlmodel import create_engine, SQLModel, Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 from pathlib import Path
 
 # Store the SQLite DB in the shared volume at /app/data
 DATABASE_URL = "sqlite:///./data/tasks.db"
-engine = create_engine(DATABASE_URL, echo=True, connect_args={"check_same_thread": False})
+ASYNC_DATABASE_URL = "sqlite+aiosqlite:///./data/tasks.db"
+
+# Pool sizing is env-tunable: agent writes are already serialized behind
+# SQLITE_WRITE_LOCK, so a small pool suffices for SQLite (readers under
+# WAL), while a Postgres deployment can raise it without code changes.
+# pre_ping/recycle are no-ops for local SQLite but avoid dead-connection
+# latency spikes on networked backends.
+_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+
+engine = create_engine(
+    DATABASE_URL,
+    # Opt-in statement logging (SQL_ECHO=1); echo formats every statement
+    # and its bind params through the logging machinery on the hot path.
+    echo=os.getenv("SQL_ECHO") == "1",
+    connect_args={"check_same_thread": False, "timeout": 30},
+    pool_pre_ping=True,
+    pool_recycle=3600,
+    pool_size=_POOL_SIZE,
+    max_overflow=_MAX_OVERFLOW,
+)
+
+
+# Async engine for the request/response REST handlers. Sync handlers each
+# pin an AnyIO worker thread for the duration of their DB wait; async
+# handlers let the event loop interleave many in-flight queries instead.
+# The agents keep using the sync engine — their DB work already runs on
+# worker threads.
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    echo=os.getenv("SQL_ECHO") == "1",
+    connect_args={"timeout": 30},
+    pool_pre_ping=True,
+    pool_recycle=3600,
+    pool_size=_POOL_SIZE,
+    max_overflow=_MAX_OVERFLOW,
+)
+
+
+# SQLite allows a single writer; without app-level serialization,
+# concurrent write tools each check out a pooled connection and then
+# queue on the database file lock, holding the connection the whole
+# time. Async write paths take this lock around their worker-thread
+# call so writes line up here instead. Reads stay unlocked — WAL
+# permits concurrent readers.
+SQLITE_WRITE_LOCK = asyncio.Lock()
+
+
+@event.listens_for(engine, "connect")
+@event.listens_for(async_engine.sync_engine, "connect")
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    """
+    Tune each new SQLite connection (both engines share the same file).
+
+    WAL lets readers proceed while a writer holds the lock instead of
+    serializing everything on the rollback journal; synchronous=NORMAL is
+    safe under WAL and drops an fsync per transaction. The remaining
+    pragmas keep temp structures and hot pages in memory.
+    """
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute("PRAGMA mmap_size=268435456")
+    cursor.execute("PRAGMA cache_size=-64000")
+    cursor.close()
+
 
 def init_db():
     """Create database tables."""
     SQLModel.metadata.create_all(engine)
 
 def get_session():
-    """Provide a transactional scope around a series of operations."""
+    """Provide a transactional scope around a series of operations (FastAPI dependency)."""
+    with Session(engine) as session:
+        yield session
+
+async def get_async_session():
+    """Async session dependency for the async REST handlers."""
+    async with AsyncSession(async_engine) as session:
+        yield session
+
+@contextmanager
+def session_scope():
+    """
+    Context-managed session for non-dependency call sites (agents, tools).
+
+    Unlike `next(get_session())` — which leaves the generator frame and its
+    `__exit__` pending until GC, keeping the connection checked out — this
+    releases the connection deterministically when the block exits.
+    """
     with Session(engine) as session:
         yield session
@@ -1,18 +1,24 @@
+import re
 from typing import List
 
 class PromptSafetyFilter:
     FORBIDDEN_KEYWORDS: List[str] = ["bomb", "kill", "terrorist"]
 
+    # Compiled once at class creation and run over the raw UTF-8 bytes:
+    # no lowercased copy of the message, one C-level pass. Substring
+    # matching (no word boundaries) on purpose, so inflections like
+    # "bombs" or "killing" stay blocked exactly as before.
+    _PATTERN = re.compile(
+        rb"(?i)("
+        + b"|".join(re.escape(k.encode("utf-8")) for k in FORBIDDEN_KEYWORDS)
+        + rb")"
+    )
+
     def is_unsafe(self, message: str) -> bool:
         """
         Checks if the message contains any forbidden keywords.
-        The check is case-insensitive and considers partial matches.
+        The check is case-insensitive and matches substrings.
         """
         if not message:
             return False
-        
-        processed_message = message.lower().strip()
-        for keyword in self.FORBIDDEN_KEYWORDS:
-            if keyword.lower() in processed_message:
-                return True
-        return False
+        return bool(self._PATTERN.search(message.encode("utf-8", "ignore")))
@@ -1,23 +1,41 @@
 # library imports
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from dotenv import load_dotenv
 
+# Load .env before the app modules are imported: the agents check
+# OPENAI_API_KEY at construction time. (This call was previously a no-op —
+# `load_dotenv` without parentheses.)
+load_dotenv()
+
 # local imports
 from app.db import init_db
+from app.agents.user_service_agent import UserServiceAgent
 from app.routers.tasks import router as tasks_router
 from app.routers.chat import router as chat_router
 
-load_dotenv
-
-app = FastAPI(title="AI-Powered Todo App")
 
-@app.on_event("startup")
-def on_startup():
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Initialize the DB and construct the orchestrator agent once at startup."""
     init_db()
+    app.state.service_agent = UserServiceAgent()
+    yield
+
+
+# orjson encodes every response (datetimes included) natively in Rust,
+# several times faster than stdlib json.dumps — free event-loop CPU.
+app = FastAPI(
+    title="AI-Powered Todo App",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
+)
 
 app.include_router(tasks_router)
 app.include_router(chat_router)
 
 @app.get("/health")
 def health():
-    return {"status": "ok"}
\ No newline at end of file
+    return {"status": "ok"}
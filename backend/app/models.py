@@ -1,3 +1,4 @@
+from sqlalchemy import Column, DateTime, func
 from sqlmodel import SQLModel, Field
 from datetime import datetime
 from typing import Optional, List
@@ -11,7 +12,22 @@ class Task(TaskBase, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
     completed: bool = Field(default=False)
     created_at: datetime = Field(default_factory=datetime.utcnow)
-    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    # Indexed: the agents order their prompt listings by recency on every
+    # turn. onupdate pushes the refresh timestamp into the DB so mutation
+    # statements don't have to compute and ship it from Python. strftime
+    # with %f keeps millisecond precision — CURRENT_TIMESTAMP truncates to
+    # whole seconds, which made rapid successive updates indistinguishable
+    # to the task-list ETag.
+    updated_at: datetime = Field(
+        default_factory=datetime.utcnow,
+        sa_column=Column(
+            DateTime,
+            nullable=False,
+            default=datetime.utcnow,
+            onupdate=func.strftime("%Y-%m-%d %H:%M:%f", "now"),
+            index=True,
+        ),
+    )
 
 class TaskCreate(TaskBase):
     pass
@@ -22,4 +38,5 @@ class TaskRead(Task):
 class TaskUpdate(SQLModel):
     title: Optional[str] = None
     description: Optional[str] = None
-    due_date: Optional[datetime] = None
\ No newline at end of file
+    due_date: Optional[datetime] = None
+    completed: Optional[bool] = None
\ No newline at end of file
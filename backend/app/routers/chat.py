@@ -1,4 +1,8 @@
-from fastapi import APIRouter, HTTPException
+import hashlib
+import time
+from typing import Dict, Optional, Tuple
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Request
 # JSONResponse is no longer needed here if we always return UserServiceOutput for 200 OK
 from pydantic import BaseModel
 
@@ -14,14 +18,37 @@ from app.agents.task_status_agent import StatusOutput
 
 router = APIRouter(prefix="/chat", tags=["chat"])
 
-_service_agent = UserServiceAgent()
 _prompt_safety_filter = PromptSafetyFilter()
 
+# Short-TTL response cache for identical messages — double-submits, client
+# retries, and polling duplicates skip the whole multi-agent LLM pipeline.
+# Plain dict + monotonic timestamps; no cachetools dependency needed at
+# this size. Clients can bypass it with `Cache-Control: no-cache`.
+_RESP_CACHE: Dict[bytes, Tuple[float, UserServiceOutput]] = {}
+_RESP_CACHE_TTL_S = 30.0
+_RESP_CACHE_MAX = 1024
+
+# Only responses with these classified intents are cached. Mutating turns
+# (create/update/delete, and unclassifiable "other") must re-run the
+# pipeline: "add task X" twice within the TTL is two intentional writes,
+# not a duplicate, and serving the first response would drop the second.
+_CACHEABLE_INTENTS = {"chat", "ask_status"}
+
+
+def _get_service_agent(request: Request) -> UserServiceAgent:
+    """The orchestrator is built once in the app's lifespan handler."""
+    return request.app.state.service_agent
+
+
 class ChatRequest(BaseModel):
     message: str
 
 @router.post("/", response_model=UserServiceOutput)
-async def chat(req: ChatRequest):
+async def chat(
+    req: ChatRequest,
+    service_agent: UserServiceAgent = Depends(_get_service_agent),
+    cache_control: Optional[str] = Header(None),
+):
     """
     Route all user messages to the UserServiceAgent.
     It will internally call support agents and optionally the manage_task tool.
@@ -43,7 +70,20 @@ async def chat(req: ChatRequest):
         )
         return guardrail_response # FastAPI will serialize this and send a 200 OK
     
+    use_cache = cache_control != "no-cache"
+    key = hashlib.blake2b(req.message.encode("utf-8"), digest_size=16).digest()
+    if use_cache:
+        hit = _RESP_CACHE.get(key)
+        if hit is not None and time.monotonic() - hit[0] < _RESP_CACHE_TTL_S:
+            return hit[1]
+
     try:
-        return await _service_agent.run(req.message)
+        result = await service_agent.run(req.message)
     except Exception as e:
-        raise HTTPException(status_code=503, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=503, detail=str(e))
+
+    if use_cache and result.intent.intent in _CACHEABLE_INTENTS:
+        if len(_RESP_CACHE) >= _RESP_CACHE_MAX:
+            _RESP_CACHE.clear()
+        _RESP_CACHE[key] = (time.monotonic(), result)
+    return result
\ No newline at end of file
@@ -11,14 +11,15 @@ All other structure (token counting, separation of concerns, error handling) is
 Optional dependency `tiktoken` still provides exact token counts.
 """
 
+import functools
 import os
 import logging
 from typing import List, Dict, Optional, Callable
 import math
-import time as time
 
 import streamlit as st
-import requests
+import httpx
+import pandas as pd
 from dotenv import load_dotenv
 
 # -----------------------------------------------------------------------------
@@ -37,34 +38,112 @@ MAX_CHAT_TOKENS = 3_000
 # -----------------------------------------------------------------------------
 # 🧮  Token utilities
 # -----------------------------------------------------------------------------
+# Memoized: Streamlit reruns the script per keystroke, so the same draft is
+# re-counted many times; the cache makes unchanged text O(1) instead of a
+# full BPE pass.
 try:
     import tiktoken  # type: ignore
-    enc = tiktoken.get_encoding("cl100k_base")
-    def token_len(text: str) -> int:  # exact
-        return len(enc.encode(text))
+    _enc = tiktoken.get_encoding("cl100k_base")
+    @functools.lru_cache(maxsize=256)
+    def _exact_token_len(text: str) -> int:  # exact
+        return len(_enc.encode(text))
 except ModuleNotFoundError:
     logging.warning("tiktoken missing – using char≈token/4 heuristic.")
-    def token_len(text: str) -> int:  # rough
+    @functools.lru_cache(maxsize=256)
+    def _exact_token_len(text: str) -> int:  # rough
         return math.ceil(len(text) / 4)
 
+def token_len(text: str) -> int:
+    """Token count for the chat limit check.
+
+    Only the upper bound is a safe envelope: past ~6 chars/token (cl100k's
+    loosest English ratio) the draft cannot be under the limit, so the
+    estimate skips the encode. There is no safe lower bound — CJK runs at
+    about one token per character and emoji can exceed it — so everything
+    else is counted exactly (still lru_cached, so unchanged drafts are
+    free).
+    """
+    n = len(text)
+    if n > MAX_CHAT_TOKENS * 6:  # definitely over, whatever the script
+        return math.ceil(n / 4)
+    return _exact_token_len(text)
+
 # -----------------------------------------------------------------------------
 # 🛠  Backend helpers
 # -----------------------------------------------------------------------------
 
-def _safe_request(fn: Callable[[], requests.Response]) -> Optional[Dict]:
+@st.cache_resource(show_spinner=False)
+def _get_client() -> httpx.Client:
+    """Shared keep-alive client – Streamlit reruns the whole script on every
+    widget interaction, so per-call connections paid a fresh TCP handshake.
+    `st.cache_resource` keeps one pooled client alive across reruns.
+    (HTTP/2 is left off: the uvicorn backend speaks HTTP/1.1.)"""
+    return httpx.Client(
+        base_url=BACKEND_URL,
+        limits=httpx.Limits(max_keepalive_connections=20, max_connections=20),
+        # Fail fast instead of hanging the ScriptRunner on a stuck backend;
+        # LLM-bound calls override the read timeout per request.
+        timeout=httpx.Timeout(5.0, connect=1.0),
+        transport=httpx.HTTPTransport(retries=3),
+        # The routers serve /tasks/ and /chat/; FastAPI 307-redirects the
+        # slashless paths, and unlike requests, httpx does not follow
+        # redirects by default.
+        follow_redirects=True,
+    )
+
+def _safe_request(fn: Callable[[], httpx.Response]) -> Optional[Dict]:
     try:
-        res = fn(); res.raise_for_status(); return res.json()
+        res = fn(); res.raise_for_status()
+        # 204 responses (DELETE) have no body to decode.
+        return res.json() if res.content else {}
     except Exception as err:
         st.error(f"Backend error: {err}")
-        logging.exception(err)
+        # warning, not exception: a down backend makes every rerun hit this
+        # path, and formatting a full traceback each time is wasted CPU.
+        logging.warning("backend error: %s", err)
         return None
 
+# Tasks are paginated newest-first; the cursor is the last task id of the
+# previous page.
+TASKS_PAGE_SIZE = 50
+
+@st.cache_data(ttl=5, show_spinner=False)
+def _fetch_tasks_cached(backend_url: str, cursor: Optional[int]) -> List[Dict]:
+    params: Dict = {"limit": TASKS_PAGE_SIZE}
+    if cursor is not None:
+        params["cursor"] = cursor
+    res = _get_client().get("/tasks", params=params, timeout=5)
+    res.raise_for_status()
+    return res.json()
+
 def fetch_tasks() -> List[Dict]:
-    data = _safe_request(lambda: requests.get(f"{BACKEND_URL}/tasks"))
-    return data or []
+    # Cached with a short TTL – the list only changes on create/update/delete,
+    # which clear the cache explicitly before rerunning, so ordinary reruns
+    # (button clicks, keystrokes) skip the backend round trip entirely.
+    # Pages the user has loaded via "Load more" are re-assembled from the
+    # per-page cache.
+    tasks: List[Dict] = []
+    try:
+        for cursor in st.session_state.setdefault("task_cursors", [None]):
+            tasks.extend(_fetch_tasks_cached(BACKEND_URL, cursor) or [])
+    except Exception as err:
+        st.error(f"Backend error: {err}")
+        logging.warning("backend error: %s", err)
+    return tasks
+
+def _reset_task_pages() -> None:
+    """Invalidate cached pages after a mutation so the next render is fresh."""
+    _fetch_tasks_cached.clear()
+    st.session_state["task_cursors"] = [None]
 
 def chat_backend(message: str) -> Optional[Dict]:
-    return _safe_request(lambda: requests.post(f"{BACKEND_URL}/chat", json={"message": message}))
+    # The agent pipeline can legitimately take tens of seconds; only the
+    # read phase gets the long leash.
+    return _safe_request(
+        lambda: _get_client().post(
+            "/chat", json={"message": message}, timeout=httpx.Timeout(60.0, connect=1.0)
+        )
+    )
 
 # -----------------------------------------------------------------------------
 # ✅  Validation helpers
@@ -76,6 +155,23 @@ within_tokens = lambda txt, lim: token_len(txt) <= lim
 # 🎨  UI components
 # -----------------------------------------------------------------------------
 
+def _apply_grid_changes(tasks: List[Dict], edited: "pd.DataFrame") -> bool:
+    """Diff the edited grid against the fetched tasks; issue one REST call
+    per toggled row. Returns True if anything was applied."""
+    applied = False
+    for orig, (_, row) in zip(tasks, edited.iterrows()):
+        if row["delete"]:
+            applied |= _safe_request(
+                lambda tid=orig["id"]: _get_client().delete(f"/tasks/{tid}")
+            ) is not None
+        # PATCH /complete only marks done, so only tick transitions apply.
+        elif row["completed"] and not orig["completed"]:
+            applied |= _safe_request(
+                lambda tid=orig["id"]: _get_client().patch(f"/tasks/{tid}/complete")
+            ) is not None
+    return applied
+
+
 def tasks_panel():
     """Render the left column – task list plus “Add Task” form with robust length guards."""
     # Reset the form if a previous oversized submission was discarded
@@ -85,21 +181,45 @@ def tasks_panel():
 
     st.header("Your Tasks")
 
-    # Show existing tasks
+    # Show existing tasks as a single data_editor grid: one React table
+    # widget (one delta message) instead of O(N) buttons, each with its own
+    # session-state slot. Done/Delete are checkbox columns, diffed against
+    # the fetched rows on Apply and sent straight to the REST endpoints.
     tasks = fetch_tasks()
-    for t in tasks:
-        st.markdown("---")
-        st.markdown(f"**• {t['title']}**")
-        if t.get("description"):
-            st.markdown(f"**Description:** {t['description']}")
-        if t.get("due_date"):
-            st.markdown(f"**Due:** {t['due_date']}")
-        st.markdown(f"_Created: {t['created_at']}  |  Updated: {t['updated_at']}_")
-
-        if st.button("Delete", key=f"del_{t['id']}"):
-            if chat_backend(f"Please delete task #{t['id']}"):
+    if tasks:
+        df = pd.DataFrame(
+            [
+                {
+                    "title": t["title"],
+                    "description": t.get("description") or "",
+                    "due": t.get("due_date") or "",
+                    "completed": t["completed"],
+                    "delete": False,
+                }
+                for t in tasks
+            ]
+        )
+        edited = st.data_editor(
+            df,
+            column_config={
+                "completed": st.column_config.CheckboxColumn("Done"),
+                "delete": st.column_config.CheckboxColumn("Delete"),
+            },
+            disabled=("title", "description", "due"),
+            hide_index=True,
+            num_rows="fixed",
+            key="tasks_grid",
+        )
+        if st.button("Apply changes"):
+            if _apply_grid_changes(tasks, edited):
+                _reset_task_pages()
                 st.rerun()
 
+        # A full last page means there may be older tasks beyond the cursor.
+        if len(tasks) % TASKS_PAGE_SIZE == 0 and st.button("Load more"):
+            st.session_state["task_cursors"].append(tasks[-1]["id"])
+            st.rerun()
+
     if not tasks:
         st.info("No tasks available.")
 
@@ -123,45 +243,26 @@ def tasks_panel():
             max_chars=MAX_DUE_LEN
         )
 
-        # UI-time validation
-        is_title_valid_ui = len(title_input) <= MAX_TITLE_LEN
-        is_desc_valid_ui  = len(desc_input)  <= MAX_DESC_LEN
-        is_due_valid_ui   = len(due_input)   <= MAX_DUE_LEN
-
-        if not is_title_valid_ui:
-            st.warning(f"Title too long – max {MAX_TITLE_LEN} chars.")
-        if not is_desc_valid_ui:
-            st.warning(f"Description too long – max {MAX_DESC_LEN} chars.")
-        if not is_due_valid_ui:
-            st.warning(f"Due date too long – max {MAX_DUE_LEN} chars.")
-
-        can_submit_form = is_title_valid_ui and is_desc_valid_ui and is_due_valid_ui
-        submit_pressed = st.form_submit_button("Add via AI", disabled=not can_submit_form)
+        submit_pressed = st.form_submit_button("Add via AI")
 
         if submit_pressed:
-            # If somehow still invalid, discard and reset
-            if not can_submit_form:
-                st.warning("Task discarded – one or more fields were too long. Please try again.")
-                st.session_state["reset_task_form"] = True
-                time.sleep(2)
-                st.rerun()
-
-            # Final hard‐stop in case of race
-            title_too_long = len(title_input) > MAX_TITLE_LEN
-            desc_too_long  = len(desc_input)  > MAX_DESC_LEN
-            due_too_long   = len(due_input)   > MAX_DUE_LEN
-
-            if title_too_long or desc_too_long or due_too_long:
-                errors = []
-                if title_too_long:
-                    errors.append(f"Title length {len(title_input)} > {MAX_TITLE_LEN}")
-                if desc_too_long:
-                    errors.append(f"Description length {len(desc_input)} > {MAX_DESC_LEN}")
-                if due_too_long:
-                    errors.append(f"Due-date length {len(due_input)} > {MAX_DUE_LEN}")
-                st.error("Task not added: " + "; ".join(errors))
+            # max_chars already enforces the limits browser-side; this single
+            # guard covers the raw-payload edge case (e.g. scripted requests).
+            oversized = [
+                (name, len(value), limit)
+                for name, value, limit in (
+                    ("Title", title_input, MAX_TITLE_LEN),
+                    ("Description", desc_input, MAX_DESC_LEN),
+                    ("Due date", due_input, MAX_DUE_LEN),
+                )
+                if len(value) > limit
+            ]
+            if oversized:
+                st.error(
+                    "Task not added: "
+                    + "; ".join(f"{n} length {l} > {lim}" for n, l, lim in oversized)
+                )
                 st.session_state["reset_task_form"] = True
-                time.sleep(3)
                 st.stop()
 
             # All good – trim and send to backend
@@ -173,10 +274,10 @@ def tasks_panel():
                 f"with description '{desc_clean}' and due date '{due_clean}'."
             )
             if chat_backend(prompt):
+                _reset_task_pages()
                 st.rerun()
             else:
                 st.error("Backend reported an issue adding the task.")
-                time.sleep(2)
 
 
 def chat_panel():
@@ -217,7 +318,6 @@ def chat_panel():
             if not can_send:  # Should not happen; double-check anyway
                 st.warning("Message discarded – too many tokens. Please try again.")
                 st.session_state["reset_chat"] = True  # trigger reset on next run
-                time.sleep(2)
                 st.rerun()
 
             # ✅  Valid submission
@@ -225,6 +325,8 @@ def chat_panel():
             resp = chat_backend(user_msg)
             reply = resp.get("chat_response") if resp and "chat_response" in resp else (resp or "No response")
             hist.append({"role": "assistant", "text": reply})
+            # Chat may have created/updated/deleted tasks via the agent.
+            _reset_task_pages()
             # clear_on_submit already empties widget draft, no need to reset
             st.rerun()
 